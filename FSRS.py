@@ -1,6 +1,132 @@
 import math
 import numpy as np
 
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    # Numba is optional; without it the kernels run as plain Python
+    HAVE_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Integer grade codes used by the kernels, and the grade name -> code table
+AGAIN, HARD, GOOD, EASY = 0, 1, 2, 3
+GRADE = {'Again': AGAIN, 'Hard': HARD, 'Good': GOOD, 'Easy': EASY}
+
+# Per-grade lookup tables, indexed by grade code
+_W15 = (0.0, 0.5, 1.0, 1.0)           # Stability scaling
+_W16 = (3.0, 1.0, 1.0, 3.0)           # Grade-based multiplier
+_DIFF_CHANGE = (1.0, 0.2, 0.0, -0.2)  # Difficulty change
+
+# fastmath flags for the JIT kernels; 'ninf' and 'nnan' are left out because
+# stability can overflow to inf and simulate_batch compares against it
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+# log2(x) == ln(x) * _INV_LOG2
+_INV_LOG2 = 1.0 / math.log(2)
+
+def _jit_kernel(func, dtype):
+    """
+    JIT-compile a kernel built by _make_kernels
+    Numba's on-disk cache is keyed by qualified name, so each dtype gets its own
+    """
+    func.__qualname__ = f'{func.__name__}_{np.dtype(dtype).name}'
+    return njit(cache=True, fastmath=_FASTMATH, error_model='numpy')(func)
+
+def _make_kernels(dtype):
+    """
+    Build the scalar stability and difficulty kernels for one float type
+    Every constant is cast to dtype so float32 callers stay in float32
+    Returns (stability_increase, update_stability, update_difficulty)
+    """
+    one = dtype(1.0)
+    ten = dtype(10.0)
+    eleven = dtype(11.0)
+    decay = dtype(0.9)
+    inv_log2 = dtype(_INV_LOG2)
+    w15_table = tuple(dtype(w) for w in _W15)
+    w16_table = tuple(dtype(w) for w in _W16)
+    diff_change = tuple(dtype(c) for c in _DIFF_CHANGE)
+
+    def stability_increase(S, D, R, grade_int, w1):
+        """
+        Scalar stability increase kernel, see FSRS.stability_increase
+        """
+        f_D = eleven - D  # Linear difficulty factor
+        f_S = max(one, one / (math.log1p(S) * inv_log2))  # Stability saturation
+        f_R = max(one, one / (math.log1p(R) * inv_log2))  # Retrievability impact
+
+        # Stability adjustment based on grade
+        w15 = w15_table[grade_int]
+        w16 = w16_table[grade_int]
+
+        # Ensure stability doesn't decrease
+        return max(one, (f_D * f_S * f_R) * w1 * w15 * w16)
+
+    stability_increase = _jit_kernel(stability_increase, dtype)
+
+    def update_stability(S, D, R, grade_int, w1, w11, w12):
+        """
+        Scalar stability update kernel, see FSRS.update_stability
+        """
+        if grade_int == AGAIN:
+            # Special formula for lapse
+            return min(S, S * D ** -w12 * w11)
+        return S * stability_increase(S, D, R, grade_int, w1)
+
+    def update_difficulty(D, grade_int, w4_tenth):
+        """
+        Scalar difficulty update kernel, see FSRS.update_difficulty
+        """
+        # Grade impact on difficulty, then mean reversion
+        D_new = (D + diff_change[grade_int]) * decay + w4_tenth
+
+        # Constrain difficulty between 1-10
+        return one if D_new < one else (ten if D_new > ten else D_new)
+
+    return stability_increase, _jit_kernel(update_stability, dtype), _jit_kernel(update_difficulty, dtype)
+
+# float64 kernels for the interactive FSRS methods
+_stability_increase, _update_stability, _update_difficulty = _make_kernels(np.float64)
+
+# float32 kernels for the simulate_batch kernel
+_, _update_stability_f32, _update_difficulty_f32 = _make_kernels(np.float32)
+
+def _batch_update(S, D, R, grades, w1, w4_tenth, w11, w12, dtype=np.float64):
+    """
+    Vectorized stability and difficulty update, see FSRS.batch_update
+    Weights may be scalars or arrays that broadcast against S and D
+    dtype: float type the arithmetic is carried out in
+    """
+    S = np.asarray(S, dtype=dtype)
+    D = np.asarray(D, dtype=dtype)
+    R = np.asarray(R, dtype=dtype)
+    grades = np.asarray(grades, dtype=np.int8)
+    again = grades == AGAIN
+
+    # Components of stability increase
+    f_D = 11 - D
+    f_S = np.maximum(1, 1.0 / (np.log1p(S) * _INV_LOG2))
+    f_R = np.maximum(1, 1.0 / (np.log1p(R) * _INV_LOG2))
+
+    w15 = np.asarray(_W15, dtype=dtype)[grades]
+    w16 = np.asarray(_W16, dtype=dtype)[grades]
+
+    SInc = np.maximum(1, (f_D * f_S * f_R) * w1 * w15 * w16)
+
+    # Lapse and normal branches, blended per card
+    S_lapse = np.minimum(S, S * D ** -w12 * w11)
+    S_new = np.where(again, S_lapse, S * SInc)
+
+    D_new = np.clip((D + np.asarray(_DIFF_CHANGE, dtype=dtype)[grades]) * 0.9 + w4_tenth, 1.0, 10.0)
+
+    return S_new, D_new
+
 class FSRS:
     def __init__(self, params=None):
         # Default parameters if not provided
@@ -23,13 +149,26 @@ class FSRS:
         else:
             self.params = params
 
+        self.refresh()
+
+    def refresh(self):
+        """
+        Cache the parameters as float attributes (self._w1, ...) for the hot path
+        self.params is kept for serialization; call this again after changing it
+        """
+        # Plain floats for the JIT kernels, which can't take a dict
+        for k, v in self.params.items():
+            setattr(self, '_' + k, float(v))
+        self._w4_tenth = 0.1 * self._w4  # Mean reversion target term
+
     def calculate_retrievability(self, t, S):
         """
         Calculate retrievability using the power function from FSRS v4.5
         t: time elapsed since last review
         S: memory stability
         """
-        return (1 + (t / S) ** -1) ** -1
+        # (1 + (t/S)^-1)^-1 == (1 + S/t)^-1 == t/(S + t)
+        return t / (S + t)
 
     def stability_increase(self, S, D, R, grade):
         """
@@ -37,73 +176,131 @@ class FSRS:
         S: current memory stability
         D: difficulty
         R: retrievability
-        grade: review grade (Again, Hard, Good, Easy)
+        grade: review grade code (AGAIN, HARD, GOOD, EASY)
         """
-        # Grade mapping
-        grade_map = {'Again': 1, 'Hard': 2, 'Good': 3, 'Easy': 4}
-        G = grade_map.get(grade, 3)  # Default to Good if unknown
-
-        # Components of stability increase
-        f_D = 11 - D  # Linear difficulty factor
-        f_S = max(1, (math.log(S + 1) / math.log(2)) ** -1)  # Stability saturation
-        f_R = max(1, (math.log(R + 1) / math.log(2)) ** -1)  # Retrievability impact
-
-        # Stability adjustment based on grade
-        if grade == 'Again':
-            w15 = 0  # Stability scaling for Again
-        else:
-            w15 = 1 if grade in ['Good', 'Easy'] else 0.5
-
-        w16 = 1 if grade in ['Hard', 'Good'] else 3  # Grade-based multiplier
-
-        # Combined stability increase factor
-        SInc = (f_D * f_S * f_R) * self.params['w1'] * w15 * w16
-
-        return max(1, SInc)  # Ensure stability doesn't decrease
+        return _stability_increase(S, D, R, grade, self._w1)
 
     def update_stability(self, current_S, D, R, grade):
         """
         Update memory stability based on review
         """
-        if grade == 'Again':
-            # Special formula for lapse
-            f_D = D ** -self.params['w12']
-            S_new = min(current_S, current_S * f_D * self.params['w11'])
-        else:
-            # Normal stability increase
-            S_new = current_S * self.stability_increase(current_S, D, R, grade)
-
-        return S_new
+        return _update_stability(current_S, D, R, grade, self._w1, self._w11, self._w12)
 
     def update_difficulty(self, current_D, grade, R):
         """
         Update card difficulty
         """
-        # Grade impact on difficulty
-        difficulty_change = {
-            'Again': 1.0,   # Significant increase
-            'Hard': 0.2,    # Small increase
-            'Good': 0.0,    # No change
-            'Easy': -0.2    # Small decrease
-        }
+        return _update_difficulty(current_D, grade, self._w4_tenth)
 
-        # Update difficulty
-        D_change = difficulty_change.get(grade, 0.0)
-        D_new = current_D + D_change
-
-        # Mean reversion
-        D_new = D_new * 0.9 + self.params['w4'] * 0.1
-
-        return max(1, min(10, D_new))  # Constrain difficulty between 1-10
+    def batch_update(self, S, D, R, grades):
+        """
+        Update stability and difficulty for a batch of cards at once
+        S, D, R: arrays of stability, difficulty and retrievability
+        grades: int8 array of grade codes (AGAIN, HARD, GOOD, EASY)
+        Returns the new (S, D) arrays
+        """
+        return _batch_update(S, D, R, grades, self._w1, self._w4_tenth, self._w11, self._w12)
 
     def predict_review_outcome(self, S, D, R):
         """
         Predict probability of successfully recalling the card
         """
-        return (1 + (1/R - 1) / math.exp(S * math.log(math.e) / 10)) ** -1
+        # (1 + (1/R - 1)/e^(S/10))^-1, with 1/R - 1 kept factored as (1 - R)/R
+        # so it doesn't cancel for R near 1
+        odds = (1.0 - R) / R
+        return 1.0 / (1.0 + odds * math.exp(-S * 0.1))
+
+def simulate_batch(params, initial_S, initial_D, grade_sequences, elapsed=1.0, target_stability=36500.0):
+    """
+    Simulate review sequences for many parameter sets at once
+    params: dict of (P,) arrays, one value per candidate parameter set
+    initial_S, initial_D: (N,) arrays of starting stability and difficulty
+    grade_sequences: (N, T) int8 array of grade codes, one row per card
+    elapsed: time between reviews, used for retrievability
+    target_stability: cards at or above this stability stop being reviewed;
+        the default of 100 years keeps S well inside float32 range
+    Returns the final (S, D) arrays, shape (P, N), as float32
+
+    State, weights and arithmetic are float32 to halve memory traffic; the
+    interactive FSRS methods stay float64. With Numba installed the parameter
+    sets are spread across cores (the thread count follows NUMBA_NUM_THREADS);
+    otherwise NumPy is used. Cards whose S overflows to inf, or becomes nan (e.g.
+    a lapse with w11 = 0), stop being updated in both backends.
+    """
+    # One row per parameter set: w1, 0.1 * w4, w11, w12
+    weights = np.column_stack([
+        np.asarray(params['w1'], dtype=np.float32),
+        np.float32(0.1) * np.asarray(params['w4'], dtype=np.float32),
+        np.asarray(params['w11'], dtype=np.float32),
+        np.asarray(params['w12'], dtype=np.float32),
+    ])
+    initial_S = np.asarray(initial_S, dtype=np.float32)
+    initial_D = np.asarray(initial_D, dtype=np.float32)
+    grade_sequences = np.ascontiguousarray(grade_sequences, dtype=np.int8)
+
+    if HAVE_NUMBA:
+        return _simulate_batch_parallel(weights, initial_S, initial_D, grade_sequences,
+                                        np.float32(elapsed), np.float32(target_stability))
+    return _simulate_batch_numpy(weights, initial_S, initial_D, grade_sequences,
+                                 elapsed, target_stability)
+
+@njit(parallel=True, fastmath=_FASTMATH, error_model='numpy', cache=True)
+def _simulate_batch_parallel(weights, initial_S, initial_D, grade_sequences, elapsed, target_stability):
+    """
+    simulate_batch kernel, one parameter set per parallel iteration
+    Each review uses the float32 instances of the interactive FSRS kernels
+    """
+    P = weights.shape[0]
+    N, T = grade_sequences.shape
+    S_out = np.empty((P, N), dtype=np.float32)
+    D_out = np.empty((P, N), dtype=np.float32)
+
+    for p in prange(P):
+        w1, w4_tenth, w11, w12 = weights[p, 0], weights[p, 1], weights[p, 2], weights[p, 3]
+        for n in range(N):
+            S = initial_S[n]
+            D = initial_D[n]
+            for t in range(T):
+                # Cards that reached the target (or whose S is nan) keep their state
+                if not S < target_stability:
+                    break
+                R = elapsed / (S + elapsed)
+                grade = grade_sequences[n, t]
+                S, D = (_update_stability_f32(S, D, R, grade, w1, w11, w12),
+                        _update_difficulty_f32(D, grade, w4_tenth))
+            S_out[p, n] = S
+            D_out[p, n] = D
+
+    return S_out, D_out
+
+def _simulate_batch_numpy(weights, initial_S, initial_D, grade_sequences, elapsed, target_stability):
+    """
+    simulate_batch fallback, vectorized over all (P, N) cards per timestep
+    """
+    # (P, 1) columns broadcast against the (P, N) state
+    w1, w4_tenth, w11, w12 = (weights[:, [k]] for k in range(4))
+
+    shape = (weights.shape[0], grade_sequences.shape[0])
+    S = np.broadcast_to(initial_S, shape).copy()
+    D = np.broadcast_to(initial_D, shape).copy()
+
+    for t in range(grade_sequences.shape[1]):
+        # Cards that reached the target (or whose S is nan) keep their state
+        active = S < target_stability
+        if not active.any():
+            break
+
+        R = np.float32(elapsed) / (S + np.float32(elapsed))
+        S_new, D_new = _batch_update(S, D, R, grade_sequences[:, t], w1, w4_tenth, w11, w12,
+                                     dtype=np.float32)
+        S = np.where(active, S_new, S)
+        D = np.where(active, D_new, D)
+
+    return S, D
 
 def calculate_stability(initial_stability, initial_difficulty, initial_retrievability, grade):
     fsrs = FSRS()
+    G = GRADE.get(grade, GOOD)
 
     # Simulate a few reviews
     current_S = initial_stability
@@ -117,8 +314,8 @@ def calculate_stability(initial_stability, initial_difficulty, initial_retrievab
     success_probability = fsrs.predict_review_outcome(current_S, current_D, R)
     
     # Update stability and difficulty
-    current_S = fsrs.update_stability(current_S, current_D, R, grade)
-    current_D = fsrs.update_difficulty(current_D, grade, R)
+    current_S = fsrs.update_stability(current_S, current_D, R, G)
+    current_D = fsrs.update_difficulty(current_D, G, R)
     
     print(f"Grade: {grade}")
     print(f"New Stability: {current_S}")
@@ -1,158 +1,170 @@
-import math
-import random
 import json
 import os
+import time
+import heapq
+import numpy as np
 from datetime import datetime, timedelta
-
-class FSRS:
-    def __init__(self, params=None):
-        # Default parameters if not provided
-        if params is None:
-            self.params = {
-                'w1': 1.0, 'w2': 1.0, 'w3': 1.0, 'w4': 1.0,
-                'w5': 1.0, 'w6': 1.0, 'w7': 1.0, 'w8': 1.0,
-                'w11': 1.0, 'w12': 1.0, 'w15': 1.0, 'w16': 1.0
-            }
-        else:
-            self.params = params
-
-    def calculate_retrievability(self, t, S):
-        return (1 + (t / S) ** -1) ** -1
-
-    def stability_increase(self, S, D, R, grade):
-        grade_map = {'Again': 1, 'Hard': 2, 'Good': 3, 'Easy': 4}
-        G = grade_map.get(grade, 3)
-
-        f_D = 11 - D
-        f_S = max(1, (math.log(S + 1) / math.log(2)) ** -1)
-        f_R = max(1, (math.log(R + 1) / math.log(2)) ** -1)
-
-        w15 = 0 if grade == 'Again' else 1 if grade in ['Good', 'Easy'] else 0.5
-        w16 = 1 if grade in ['Hard', 'Good'] else 3
-
-        SInc = (f_D * f_S * f_R) * self.params['w1'] * w15 * w16
-        return max(1, SInc)
-
-    def update_stability(self, current_S, D, R, grade):
-        if grade == 'Again':
-            f_D = D ** -self.params['w12']
-            S_new = min(current_S, current_S * f_D * self.params['w11'])
-        else:
-            S_new = current_S * self.stability_increase(current_S, D, R, grade)
-        return S_new
-
-    def update_difficulty(self, current_D, grade, R):
-        difficulty_change = {
-            'Again': 1.0, 'Hard': 0.2, 'Good': 0.0, 'Easy': -0.2
-        }
-        D_change = difficulty_change.get(grade, 0.0)
-        D_new = current_D + D_change
-        D_new = D_new * 0.9 + self.params['w4'] * 0.1
-        return max(1, min(10, D_new))
+from FSRS import FSRS, GOOD, GRADE
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    # orjson is optional; fall back to compact stdlib json
+    def _dumps(data):
+        return json.dumps(data, separators=(',', ':')).encode()
+    _loads = json.loads
+
+def _to_unix(value):
+    """ Saved times are Unix timestamps; older saves use ISO strings. """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return value
+
+# Initial memory state for a question with no saved data
+INITIAL_STABILITY = 0.0001  # Changed from 1.0 to 0.0001
+INITIAL_DIFFICULTY = 5.0
+
+GRAVITY = 9.8  # Gravitational acceleration (m/s²)
+
+# Number of problems pre-generated per category at a time
+QUESTION_POOL_SIZE = 4096
+
+# Question and solution-step templates per category
+_KINEMATICS_Q = ("An object starts with an initial velocity of {v0} m/s. "
+                 "If it accelerates at {a} m/s², "
+                 "what is its velocity after {t} seconds?")
+_KINEMATICS_STEPS = ("v = v₀ + at", "v = {v0} + {a} × {t}", "v = {v} m/s")
+
+_DYNAMICS_Q = ("A {m} kg object experiences an acceleration of {a} m/s². "
+               "What is the net force acting on it?")
+_DYNAMICS_STEPS = ("F = ma", "F = {m} × {a}", "F = {F} N")
+
+_ENERGY_Q = ("An object with a mass of {m} kg is raised to a height of {h} m. "
+             "Calculate its gravitational potential energy.")
+_ENERGY_STEPS = ("PE = mgh", "PE = {m} × {g} × {h}", "PE = {PE} J")
+
+_CIRCULAR_MOTION_Q = ("An object moves in a circular path with a radius of {r} m "
+                      "and a velocity of {v} m/s. "
+                      "What is its centripetal acceleration?")
+_CIRCULAR_MOTION_STEPS = ("a = v²/r", "a = {v}²/{r}", "a = {a} m/s²")
 
 class PhysicsQuestion:
-    def __init__(self, question_type):
-        self.question_type = question_type
-        self.stability = 0.0001  # Changed from 1.0 to 0.0001
-        self.difficulty = 5.0
-        self.last_reviewed = datetime.now()
-        self.next_review = datetime.now()
-
-    def generate_question(self):
-        methods = {
-            'kinematics': self.generate_kinematics_question,
-            'dynamics': self.generate_dynamics_question,
-            'energy': self.generate_energy_question,
-            'circular_motion': self.generate_circular_motion_question
-        }
-        return methods[self.question_type]()
+    """ Question generator for one category; review state lives in PhysicsFlashcardStudyApp """
+    __slots__ = ('question_type', 'rng', 'pool_size', 'pool', 'cursor')
 
-    def generate_kinematics_question(self):
-        initial_velocity = round(random.uniform(0, 20), 2)
-        acceleration = round(random.uniform(0.5, 5), 2)
-        time = round(random.uniform(1, 10), 2)
+    def __init__(self, question_type, rng=None, pool_size=QUESTION_POOL_SIZE):
+        self.question_type = question_type
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pool_size = pool_size
+        self.refill()
+
+    def refill(self):
+        """ Pre-generate a pool of problem values for this category. """
+        roll, _ = _QUESTION_METHODS[self.question_type]
+        self.pool = roll(self, self.pool_size)
+        self.cursor = 0
+
+    def generate_question(self, need_text=True):
+        """
+        Return the next problem from the pool
+        need_text: if False, skip formatting and return only the answer (for simulation)
+        """
+        if self.cursor == len(self.pool):
+            self.refill()
+        values = self.pool[self.cursor]
+        self.cursor += 1
+        if not need_text:
+            return {'answer': values[-1]}
+        _, format_question = _QUESTION_METHODS[self.question_type]
+        return format_question(self, *values)
+
+    def roll_kinematics(self, n):
+        initial_velocity = np.round(self.rng.uniform(0, 20, n), 2)
+        acceleration = np.round(self.rng.uniform(0.5, 5, n), 2)
+        time = np.round(self.rng.uniform(1, 10, n), 2)
 
         final_velocity = initial_velocity + acceleration * time
 
-        question = (f"An object starts with an initial velocity of {initial_velocity} m/s. "
-                    f"If it accelerates at {acceleration} m/s², "
-                    f"what is its velocity after {time} seconds?")
-        
+        return list(zip(initial_velocity.tolist(), acceleration.tolist(), time.tolist(),
+                        final_velocity.tolist(), np.round(final_velocity, 2).tolist()))
+
+    def generate_kinematics_question(self, initial_velocity, acceleration, time, final_velocity, answer):
+        kw = {'v0': initial_velocity, 'a': acceleration, 't': time, 'v': final_velocity}
         return {
-            'question': question,
-            'answer': round(final_velocity, 2),
-            'solution_steps': [
-                f"v = v₀ + at",
-                f"v = {initial_velocity} + {acceleration} × {time}",
-                f"v = {final_velocity} m/s"
-            ]
+            'question': _KINEMATICS_Q.format_map(kw),
+            'answer': answer,
+            'solution_steps_fn': lambda: [step.format_map(kw) for step in _KINEMATICS_STEPS]
         }
 
-    def generate_dynamics_question(self):
-        mass = round(random.uniform(1, 100), 2)
-        acceleration = round(random.uniform(0.5, 10), 2)
+    def roll_dynamics(self, n):
+        mass = np.round(self.rng.uniform(1, 100, n), 2)
+        acceleration = np.round(self.rng.uniform(0.5, 10, n), 2)
 
         force = mass * acceleration
 
-        question = (f"A {mass} kg object experiences an acceleration of {acceleration} m/s². "
-                    f"What is the net force acting on it?")
-        
+        return list(zip(mass.tolist(), acceleration.tolist(), force.tolist(), np.round(force, 2).tolist()))
+
+    def generate_dynamics_question(self, mass, acceleration, force, answer):
+        kw = {'m': mass, 'a': acceleration, 'F': force}
         return {
-            'question': question,
-            'answer': round(force, 2),
-            'solution_steps': [
-                "F = ma",
-                f"F = {mass} × {acceleration}",
-                f"F = {force} N"
-            ]
+            'question': _DYNAMICS_Q.format_map(kw),
+            'answer': answer,
+            'solution_steps_fn': lambda: [step.format_map(kw) for step in _DYNAMICS_STEPS]
         }
 
-    def generate_energy_question(self):
-        mass = round(random.uniform(1, 50), 2)
-        height = round(random.uniform(1, 20), 2)
-        g = 9.8
+    def roll_energy(self, n):
+        mass = np.round(self.rng.uniform(1, 50, n), 2)
+        height = np.round(self.rng.uniform(1, 20, n), 2)
 
-        potential_energy = mass * g * height
+        potential_energy = mass * GRAVITY * height
 
-        question = (f"An object with a mass of {mass} kg is raised to a height of {height} m. "
-                    f"Calculate its gravitational potential energy.")
-        
+        return list(zip(mass.tolist(), height.tolist(), potential_energy.tolist(),
+                        np.round(potential_energy, 2).tolist()))
+
+    def generate_energy_question(self, mass, height, potential_energy, answer):
+        kw = {'m': mass, 'g': GRAVITY, 'h': height, 'PE': potential_energy}
         return {
-            'question': question,
-            'answer': round(potential_energy, 2),
-            'solution_steps': [
-                "PE = mgh",
-                f"PE = {mass} × {g} × {height}",
-                f"PE = {potential_energy} J"
-            ]
+            'question': _ENERGY_Q.format_map(kw),
+            'answer': answer,
+            'solution_steps_fn': lambda: [step.format_map(kw) for step in _ENERGY_STEPS]
         }
 
-    def generate_circular_motion_question(self):
-        radius = round(random.uniform(1, 10), 2)
-        velocity = round(random.uniform(5, 30), 2)
+    def roll_circular_motion(self, n):
+        radius = np.round(self.rng.uniform(1, 10, n), 2)
+        velocity = np.round(self.rng.uniform(5, 30, n), 2)
 
         centripetal_acceleration = velocity**2 / radius
 
-        question = (f"An object moves in a circular path with a radius of {radius} m "
-                    f"and a velocity of {velocity} m/s. "
-                    f"What is its centripetal acceleration?")
-        
+        return list(zip(radius.tolist(), velocity.tolist(), centripetal_acceleration.tolist(),
+                        np.round(centripetal_acceleration, 2).tolist()))
+
+    def generate_circular_motion_question(self, radius, velocity, centripetal_acceleration, answer):
+        kw = {'r': radius, 'v': velocity, 'a': centripetal_acceleration}
         return {
-            'question': question,
-            'answer': round(centripetal_acceleration, 2),
-            'solution_steps': [
-                "a = v²/r",
-                f"a = {velocity}²/{radius}",
-                f"a = {centripetal_acceleration} m/s²"
-            ]
+            'question': _CIRCULAR_MOTION_Q.format_map(kw),
+            'answer': answer,
+            'solution_steps_fn': lambda: [step.format_map(kw) for step in _CIRCULAR_MOTION_STEPS]
         }
 
+# Category -> (value roller, question formatter), called with the PhysicsQuestion
+_QUESTION_METHODS = {
+    'kinematics': (PhysicsQuestion.roll_kinematics, PhysicsQuestion.generate_kinematics_question),
+    'dynamics': (PhysicsQuestion.roll_dynamics, PhysicsQuestion.generate_dynamics_question),
+    'energy': (PhysicsQuestion.roll_energy, PhysicsQuestion.generate_energy_question),
+    'circular_motion': (PhysicsQuestion.roll_circular_motion, PhysicsQuestion.generate_circular_motion_question)
+}
+
 class PhysicsFlashcardStudyApp:
     def __init__(self, study_duration, categories=None):
         self.fsrs = FSRS()
-        self.study_duration = timedelta(minutes=study_duration)
-        self.start_time = datetime.now()
+        self.duration_s = study_duration * 60.0
+        self.start_ts = time.monotonic()
+        # Review times are kept on the monotonic clock; this converts them to Unix time
+        self._epoch_offset = time.time() - self.start_ts
         self.questions = []
+        self.rng = np.random.default_rng()
         self.save_file = 'physics_flashcard_data.json'
 
         # Default categories if none specified
@@ -162,50 +174,70 @@ class PhysicsFlashcardStudyApp:
         # Load existing data if available
         existing_data = self.load_previous_data()
 
+        # Review state is kept as parallel arrays, one entry per question
+        now = self.start_ts
+        saved = {category: i for i, category in enumerate(existing_data.get('question_type', []))}
+        stabilities, difficulties, last_reviewed, next_review = [], [], [], []
+
         # Create or update questions based on loaded data and selected categories
         for category in categories:
-            # Check if a question of this category already exists in loaded data
-            existing_question = next((q for q in existing_data if q['question_type'] == category), None)
-            
-            if existing_question:
+            self.questions.append(PhysicsQuestion(category, self.rng))
+            i = saved.get(category)
+
+            if i is not None:
                 # Restore question from saved data
-                question = PhysicsQuestion(category)
-                question.stability = existing_question['stability']
-                question.difficulty = existing_question['difficulty']
-                question.last_reviewed = datetime.fromisoformat(existing_question['last_reviewed'])
-                question.next_review = datetime.fromisoformat(existing_question['next_review'])
+                stabilities.append(existing_data['stability'][i])
+                difficulties.append(existing_data['difficulty'][i])
+                last_reviewed.append(_to_unix(existing_data['last_reviewed'][i]) - self._epoch_offset)
+                next_review.append(_to_unix(existing_data['next_review'][i]) - self._epoch_offset)
             else:
                 # Create new question if no saved data exists
-                question = PhysicsQuestion(category)
-                question.next_review = datetime.now()  # Make it immediately reviewable
-
-            self.questions.append(question)
+                stabilities.append(INITIAL_STABILITY)
+                difficulties.append(INITIAL_DIFFICULTY)
+                last_reviewed.append(now)
+                next_review.append(now)  # Make it immediately reviewable
+
+        self.S = np.array(stabilities, dtype=np.float64)
+        self.D = np.array(difficulties, dtype=np.float64)
+        self.last_reviewed = np.array(last_reviewed, dtype=np.float64)  # Monotonic seconds
+        self.next_review = np.array(next_review, dtype=np.float64)      # Monotonic seconds
+
+        # Min-heap of (next_review, index); the top is always the earliest-due question
+        self._heap = [(ts, i) for i, ts in enumerate(next_review)]
+        heapq.heapify(self._heap)
+
+        # Warm up the JIT kernels with the argument types run_study_session uses,
+        # so compilation doesn't stall the first review. R is len(self.questions)
+        # there; 1 has the same type and doesn't divide by zero with no questions
+        self.fsrs.update_stability(INITIAL_STABILITY, INITIAL_DIFFICULTY, 1, GOOD)
+        self.fsrs.update_difficulty(INITIAL_DIFFICULTY, GOOD, 1)
 
     def load_previous_data(self):
-        """ Load data from the saved file if it exists. """
+        """ Load column-wise data from the saved file if it exists. """
         if os.path.exists(self.save_file):
             try:
-                with open(self.save_file, 'r') as f:
-                    return json.load(f)
+                with open(self.save_file, 'rb') as f:
+                    data = _loads(f.read())
             except (json.JSONDecodeError, IOError):
-                return []
-        return []
+                return {}
+            if isinstance(data, list):
+                # Older saves store one dict per question
+                keys = ('question_type', 'stability', 'difficulty', 'last_reviewed', 'next_review')
+                data = {key: [q[key] for q in data] for key in keys}
+            return data
+        return {}
 
     def run_study_session(self):
-        while datetime.now() - self.start_time < self.study_duration:
-            current_time = datetime.now()
+        min_stability_days = self.duration_s / (24 * 3600)
 
-            if all(q.stability >= self.study_duration.total_seconds() / (24 * 3600) for q in self.questions):
+        while time.monotonic() - self.start_ts < self.duration_s:
+            if (self.S >= min_stability_days).all():
                 print("\n🎉 All questions have reached desired stability. Study session complete!")
                 break
-            
-            # Find reviewable questions
-            reviewable_questions = [q for q in self.questions if q.next_review <= current_time]
-            if not reviewable_questions:
-                reviewable_questions = self.questions
 
-            question_to_review = min(reviewable_questions, key=lambda q: q.next_review)
-            problem = question_to_review.generate_question()
+            # Earliest-due question, whether or not it is due yet
+            idx = self._heap[0][1]
+            problem = self.questions[idx].generate_question()
             
             print("\n" + "=" * 50)
             print(problem['question'])
@@ -215,7 +247,7 @@ class PhysicsFlashcardStudyApp:
             show_solution = input("Would you like to see the solution steps? (y/n): ").lower()
             if show_solution == 'y':
                 print("\nSolution Steps:")
-                for step in problem['solution_steps']:
+                for step in problem['solution_steps_fn']():
                     print(step)
 
             # Get user answer
@@ -236,32 +268,28 @@ class PhysicsFlashcardStudyApp:
 
             # Ask for difficulty rating
             grade = input("How difficult was this problem? (Again/Hard/Good/Easy): ").capitalize()
-            question_to_review.stability = self.fsrs.update_stability(question_to_review.stability, 
-                                                                     question_to_review.difficulty, 
-                                                                     len(self.questions), 
-                                                                     grade)
-            question_to_review.difficulty = self.fsrs.update_difficulty(question_to_review.difficulty, 
-                                                                       grade, len(self.questions))
-            question_to_review.next_review = datetime.now() + timedelta(days=question_to_review.stability)
-            elapsed_time = datetime.now() - self.start_time
-            remaining_time = self.study_duration - elapsed_time
-            print(f"\n📊 Progress: {elapsed_time.total_seconds() / self.study_duration.total_seconds() * 100:.1f}% complete")
-            print(f"Time remaining: {remaining_time}")
+            grade = GRADE.get(grade, GOOD)
+            self.S[idx] = self.fsrs.update_stability(self.S[idx], self.D[idx], len(self.questions), grade)
+            self.D[idx] = self.fsrs.update_difficulty(self.D[idx], grade, len(self.questions))
+            now = time.monotonic()
+            self.last_reviewed[idx] = now
+            self.next_review[idx] = now + self.S[idx] * 24 * 3600
+            heapq.heapreplace(self._heap, (float(self.next_review[idx]), idx))
+            elapsed_s = now - self.start_ts
+            print(f"\n📊 Progress: {elapsed_s / self.duration_s * 100:.1f}% complete")
+            print(f"Time remaining: {timedelta(seconds=self.duration_s - elapsed_s)}")
 
     def save_data(self):
         """ Save the study session data for future reference. """
-        data = [
-            {
-                'question_type': q.question_type,
-                'stability': q.stability,
-                'difficulty': q.difficulty,
-                'last_reviewed': q.last_reviewed.isoformat(),
-                'next_review': q.next_review.isoformat()
-            }
-            for q in self.questions
-        ]
-        with open(self.save_file, 'w') as f:
-            json.dump(data, f)
+        data = {
+            'question_type': [q.question_type for q in self.questions],
+            'stability': self.S.tolist(),
+            'difficulty': self.D.tolist(),
+            'last_reviewed': (self.last_reviewed + self._epoch_offset).tolist(),  # Unix timestamps
+            'next_review': (self.next_review + self._epoch_offset).tolist()
+        }
+        with open(self.save_file, 'wb') as f:
+            f.write(_dumps(data))
 
 def main():
     study_duration = int(input("Enter study session duration (minutes): "))
@@ -1,6 +1,14 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 import random
 
+try:
+    from orjson import dumps as _dumps
+except ImportError:
+    # orjson is optional; fall back to stdlib json
+    import json
+    def _dumps(data):
+        return json.dumps(data).encode()
+
 app = Flask(__name__)
 
 # Sample text content to be displayed during the session
@@ -11,6 +19,9 @@ texts = [
     "Chemistry helps us understand the composition of substances."
 ]
 
+# JSON bodies for /start_session, serialized once at import time
+_RESPONSES = [_dumps({"text": t}) for t in texts]
+
 # Route for the main page
 @app.route('/')
 def index():
@@ -27,7 +38,7 @@ def create_profile():
 # Route to handle starting a session
 @app.route('/start_session', methods=['POST'])
 def start_session():
-    return jsonify({"text": random.choice(texts)})
+    return Response(random.choice(_RESPONSES), mimetype='application/json')
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=False, threaded=True)
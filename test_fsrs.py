@@ -0,0 +1,115 @@
+import math
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from FSRS import FSRS, AGAIN, HARD, GOOD, EASY, HAVE_NUMBA, simulate_batch, _simulate_batch_numpy
+
+# Log-spaced grids covering tiny to large stability and elapsed time, and
+# retrievability from near zero up to 1
+GRID = np.logspace(-9, 4, 27).tolist()
+R_GRID = np.logspace(-6, 0, 34).tolist()
+
+def baseline_retrievability(t, S):
+    """ Original calculate_retrievability formula """
+    return (1 + (t / S) ** -1) ** -1
+
+def baseline_review_outcome(S, D, R):
+    """ Original predict_review_outcome formula """
+    return (1 + (1/R - 1) / math.exp(S * math.log(math.e) / 10)) ** -1
+
+def test_retrievability_matches_baseline():
+    fsrs = FSRS()
+    for t in GRID:
+        for S in GRID:
+            assert math.isclose(fsrs.calculate_retrievability(t, S), baseline_retrievability(t, S), rel_tol=1e-12)
+
+def test_review_outcome_matches_baseline():
+    fsrs = FSRS()
+    for S in GRID[:-1]:  # e^(S/10) overflows past S ~ 7000
+        for R in R_GRID:
+            assert math.isclose(fsrs.predict_review_outcome(S, 5.0, R), baseline_review_outcome(S, 5.0, R), rel_tol=1e-12)
+
+def test_retrievability_tiny_stability():
+    fsrs = FSRS()
+    for t in (0.5, 1.0, 2.0, 30.0):
+        # Exact rational value of (1 + (t/S)^-1)^-1 for S = 1e-9
+        S = Fraction(1e-9)
+        exact = 1 / (1 + 1 / (Fraction(t) / S))
+        assert math.isclose(fsrs.calculate_retrievability(t, 1e-9), float(exact), rel_tol=1e-15)
+
+def test_batch_update_matches_scalar_methods():
+    fsrs = FSRS()
+    rng = np.random.default_rng(0)
+    S = rng.uniform(0.01, 100.0, 64)
+    D = rng.uniform(1.0, 10.0, 64)
+    R = rng.uniform(0.01, 1.0, 64)
+    grades = np.tile(np.array([AGAIN, HARD, GOOD, EASY], dtype=np.int8), 16)
+    S_new, D_new = fsrs.batch_update(S, D, R, grades)
+    for i, grade in enumerate(grades.tolist()):
+        assert math.isclose(S_new[i], fsrs.update_stability(S[i], D[i], R[i], grade), rel_tol=1e-12)
+        assert math.isclose(D_new[i], fsrs.update_difficulty(D[i], grade, R[i]), rel_tol=1e-12)
+
+def _run_backends(params, initial_S, initial_D, grades):
+    """ Run simulate_batch and its NumPy fallback on the same inputs """
+    weights = np.column_stack([params['w1'], 0.1 * params['w4'], params['w11'], params['w12']]).astype(np.float32)
+    fast = simulate_batch(params, initial_S, initial_D, grades)
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        fallback = _simulate_batch_numpy(weights, np.float32(initial_S), np.float32(initial_D), grades,
+                                         1.0, 36500.0)
+    return fast, fallback
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="simulate_batch only has the NumPy backend without Numba")
+def test_simulate_batch_backends_agree():
+    rng = np.random.default_rng(0)
+    P, N, T = 8, 16, 20
+    params = {'w1': rng.uniform(0.5, 2.0, P), 'w4': rng.uniform(0.0, 10.0, P),
+              'w11': rng.uniform(0.5, 2.0, P), 'w12': rng.uniform(0.5, 2.0, P)}
+    initial_S = rng.uniform(0.01, 10.0, N)
+    initial_D = rng.uniform(1.0, 10.0, N)
+    grades = rng.integers(AGAIN, EASY + 1, (N, T)).astype(np.int8)
+    (S, D), (S_np, D_np) = _run_backends(params, initial_S, initial_D, grades)
+    assert S.shape == D.shape == (P, N)
+    assert S.dtype == np.float32 and D.dtype == np.float32
+    # float32 rounding compounds over T chained reviews, hence the looser rtol
+    assert np.allclose(S, S_np, rtol=1e-4) and np.allclose(D, D_np, rtol=1e-4)
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="simulate_batch only has the NumPy backend without Numba")
+def test_simulate_batch_backends_agree_on_zero_lapse_factor():
+    # w11 = 0 sends S to 0 on a lapse and the next review divides by log1p(0)
+    params = {'w1': np.ones(3), 'w4': np.ones(3), 'w11': np.array([1.0, 0.0, 1.0]), 'w12': np.ones(3)}
+    grades = np.array([[GOOD, AGAIN, GOOD, GOOD], [GOOD, GOOD, GOOD, GOOD]], dtype=np.int8)
+    (S, D), (S_np, D_np) = _run_backends(params, [0.5, 0.5], [5.0, 5.0], grades)
+    assert np.isnan(S[1, 0]) and ((D >= 1.0) & (D <= 10.0)).all()
+    assert np.allclose(S, S_np, rtol=1e-5, equal_nan=True) and np.allclose(D, D_np, rtol=1e-5)
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="the parallel kernel needs Numba")
+def test_simulate_batch_matches_interactive_reviews():
+    fsrs = FSRS()
+    grades = [GOOD, AGAIN, HARD, EASY, AGAIN, GOOD]
+    S, D = 0.5, 5.0
+    for grade in grades:
+        R = fsrs.calculate_retrievability(1.0, S)
+        S, D = fsrs.update_stability(S, D, R, grade), fsrs.update_difficulty(D, grade, R)
+
+    params = {k: np.ones(1) for k in ('w1', 'w4', 'w11', 'w12')}
+    S_batch, D_batch = simulate_batch(params, [0.5], [5.0], np.array([grades], dtype=np.int8))
+    assert np.allclose(S_batch, S, rtol=1e-5) and np.allclose(D_batch, D, rtol=1e-5)
+
+def test_simulate_batch_overflow_stops_updates():
+    weights = np.array([[1.0, 0.1, 1.0, 1.0]], dtype=np.float32)
+    results = []
+    for T in (15, 30):
+        grades = np.full((1, T), GOOD, dtype=np.int8)
+        with np.errstate(over='ignore', invalid='ignore'):
+            results.append(_simulate_batch_numpy(weights, np.float32([0.0001]), np.float32([5.0]), grades,
+                                                 1.0, np.inf))
+    (S, D), (_, D_later) = results
+    # S overflows to inf, after which the card's difficulty stops changing
+    assert np.isinf(S).all() and np.isfinite(D).all() and np.array_equal(D, D_later)
+
+def test_simulate_batch_default_stays_finite():
+    params = {k: np.ones(1) for k in ('w1', 'w4', 'w11', 'w12')}
+    S, D = simulate_batch(params, [0.0001], [5.0], np.full((1, 30), GOOD, dtype=np.int8))
+    assert np.isfinite(S).all() and np.isfinite(D).all()